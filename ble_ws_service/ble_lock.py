@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Callable, List, Optional, Coroutine, Any
+from typing import Callable, List, Optional, Coroutine, Any, Tuple
 
+import msgspec
 from yalexs_ble import (
     PushLock,
     LockState,
@@ -14,9 +15,16 @@ from yalexs_ble import (
     YaleXSBLEError,
     close_stale_connections_by_address,
 )
+from yalexs_ble.const import LockStatus, DoorStatus
 
 _LOGGER = logging.getLogger(__name__)
 
+_json_encode = msgspec.json.encode
+
+# Precomputed enum member -> name strings used by snapshot()
+_LOCK_NAMES = {m: m.name for m in LockStatus}
+_DOOR_NAMES = {m: m.name for m in DoorStatus}
+
 StateListener = Callable[[str, LockState, LockInfo, ConnectionInfo], Coroutine[Any, Any, None]]
 
 
@@ -38,8 +46,14 @@ class BleLock:
         self.lock_name = lock_name
         self.address = address
         self.serial = serial
+        self.local_name = serial_to_local_name(serial)
+        # Immutable identity fields, copied into every snapshot
+        self._snapshot_base = {"lock_name": lock_name, "address": address, "serial": serial}
+        # Same fields pre-encoded as an open JSON object: '{"lock_name":...,"serial":...,'
+        # (same encoder as the WebSocket server, so event frames are uniformly compact)
+        self._static_json_prefix = _json_encode(self._snapshot_base)[:-1].decode() + ","
         self._push_lock = PushLock(
-            local_name=serial_to_local_name(self.serial),
+            local_name=self.local_name,
             address=address,
             key=key,
             key_index=slot,
@@ -48,6 +62,7 @@ class BleLock:
         self._shutdown_cb: Optional[Callable[[], None]] = None
         self._listeners: List[StateListener] = []
         self._first_update_waited = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # bound in start()
 
     def register_state_listener(self, listener: StateListener) -> None:
         self._listeners.append(listener)
@@ -59,18 +74,18 @@ class BleLock:
         - start PushLock background tasks
         - wait for first update (or timeout)
         """
-        _LOGGER.info("[%s] closing stale connections at %s", self.lock_name, self.address)
-        await close_stale_connections_by_address(self.address)
+        await self.close_stale_connections()
 
         _LOGGER.info("[%s] starting PushLock", self.lock_name)
+        self._loop = asyncio.get_running_loop()
 
         # Register callback into PushLock; this is a sync callback
         def _state_changed(
             new_state: LockState, lock_info: LockInfo, conn_info: ConnectionInfo
         ) -> None:
-            # fan out to async listeners
-            for listener in self._listeners:
-                asyncio.create_task(listener(self.lock_name, new_state, lock_info, conn_info))
+            # fan out to async listeners (one task per state change)
+            if self._listeners:
+                self._loop.create_task(self._fanout(new_state, lock_info, conn_info))
 
         self._push_lock.register_callback(_state_changed)
 
@@ -91,6 +106,22 @@ class BleLock:
                 ex,
             )
 
+    async def _fanout(
+        self, new_state: LockState, lock_info: LockInfo, conn_info: ConnectionInfo
+    ) -> None:
+        results = await asyncio.gather(
+            *[
+                listener(self.lock_name, new_state, lock_info, conn_info)
+                for listener in self._listeners
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.error(
+                    "[%s] error in state listener", self.lock_name, exc_info=result
+                )
+
     async def stop(self) -> None:
         """
         Shut down background tasks and connections cleanly.
@@ -103,6 +134,13 @@ class BleLock:
                 _LOGGER.exception("[%s] error during shutdown callback", self.lock_name)
             self._shutdown_cb = None
 
+    async def close_stale_connections(self) -> None:
+        """
+        Drop any half-open BLE connections to this lock.
+        """
+        _LOGGER.info("[%s] closing stale connections at %s", self.lock_name, self.address)
+        await close_stale_connections_by_address(self.address)
+
     async def lock(self) -> None:
         _LOGGER.info("[%s] lock()", self.lock_name)
         await self._push_lock.lock()
@@ -118,26 +156,59 @@ class BleLock:
         _LOGGER.info("[%s] refresh()", self.lock_name)
         await self._push_lock.update()
 
-    def snapshot(self) -> dict:
+    def snapshot(
+        self,
+        override_lock: Optional[LockStatus] = None,
+        override_door: Optional[DoorStatus] = None,
+    ) -> dict:
         """
         Return a snapshot of current known state.
         Note: this is not guaranteed to be "live" without a refresh().
+
+        override_lock / override_door replace the lock/door values reported by
+        PushLock (used by LockManager to publish its debounced stable state).
+        """
+        d = self._snapshot_base.copy()
+        d.update(self._dynamic_state(override_lock, override_door))
+        return d
+
+    def snapshot_with_json(
+        self,
+        override_lock: Optional[LockStatus] = None,
+        override_door: Optional[DoorStatus] = None,
+    ) -> Tuple[dict, str]:
+        """
+        Same as snapshot(), returned both as a dict and already JSON-encoded.
+        Only the dynamic fields are encoded per call; the static ones are cached.
         """
-        state = self._push_lock.lock_state
-        info = self._push_lock.lock_info
-        conn = self._push_lock.connection_info
+        dynamic = self._dynamic_state(override_lock, override_door)
+        encoded = self._static_json_prefix + _json_encode(dynamic)[1:].decode()
+        d = self._snapshot_base.copy()
+        d.update(dynamic)
+        return d, encoded
+
+    def _dynamic_state(
+        self,
+        override_lock: Optional[LockStatus],
+        override_door: Optional[DoorStatus],
+    ) -> dict:
+        push_lock = self._push_lock
+        state = push_lock.lock_state
+        info = push_lock.lock_info
+        conn = push_lock.connection_info
+
+        lock = override_lock if override_lock is not None else (state.lock if state else None)
+        door = override_door if override_door is not None else (state.door if state else None)
+        battery = state.battery if state else None
 
         return {
-            "lock_name": self.lock_name,
-            "address": self.address,
-            "serial": self.serial,
-            "locked": state.lock.name if state and state.lock is not None else None,
-            "door": state.door.name if state and state.door is not None else None,
-            "battery_pct": state.battery.percentage if state and state.battery else None,
+            "locked": _LOCK_NAMES.get(lock),
+            "door": _DOOR_NAMES.get(door),
+            "battery_pct": battery.percentage if battery else None,
             "rssi": conn.rssi if conn else None,
             "manufacturer": info.manufacturer if info else None,
             "model": info.model if info else None,
-            "is_connected": self._push_lock.is_connected,
+            "is_connected": push_lock.is_connected,
         }
 
     @property
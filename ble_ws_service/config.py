@@ -6,8 +6,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
 
+try:
+    from yaml import CSafeLoader as _Loader  # libyaml-backed parser
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class LockConfig:
     lock_name: str     # Unique identifier for the lock (e.g. "Front Door")
     serial: str        # August/Yale serial, e.g. "L3045P9"
@@ -16,13 +21,13 @@ class LockConfig:
     slot: int          # key index slot
     always_connected: bool = False # Whether to keep the lock always connected, note this uses more power
 
-@dataclass
+@dataclass(slots=True)
 class WebSocketConfig:
     host: str = "0.0.0.0"
     port: int = 8765
     auth_token: Optional[str] = None # Optional auth token for clients
 
-@dataclass
+@dataclass(slots=True)
 class ServiceConfig:
     websocket: WebSocketConfig
     locks: List[LockConfig]
@@ -33,8 +38,8 @@ def load_config(path: str | Path) -> ServiceConfig:
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
 
-    with path.open("r") as f:
-        raw = yaml.safe_load(f) or {}
+    with path.open("rb") as f:
+        raw = yaml.load(f, Loader=_Loader) or {}
 
     service = raw.get("service", {})
 
@@ -49,12 +54,20 @@ def load_config(path: str | Path) -> ServiceConfig:
     # --- Locks ---
     locks: List[LockConfig] = []
     for entry in service.get("locks", []):
+        key = str(entry["key"])
+        try:
+            key_valid = len(key) == 32 and len(bytes.fromhex(key)) == 16
+        except ValueError:
+            key_valid = False
+        if not key_valid:
+            raise ValueError(f"Invalid key for lock {entry['lock_name']!r}: expected 32 hex characters")
+
         locks.append(
             LockConfig(
                 lock_name=entry["lock_name"],
                 serial=entry["serial"],
                 address=entry["address"],
-                key=entry["key"],
+                key=key,
                 slot=int(entry["slot"]),
                 always_connected=bool(entry.get("always_connected", False)),
             )
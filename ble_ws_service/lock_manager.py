@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
@@ -15,6 +17,29 @@ from ble_lock import BleLock
 _LOGGER = logging.getLogger(__name__)
 
 EventListener = Callable[[dict], Awaitable[None]]
+AdvertisementSink = Callable[[BLEDevice, AdvertisementData], None]
+
+# Lock / door values that count as a stable (debounce-worthy) state
+_STABLE_LOCK = frozenset({LockStatus.LOCKED, LockStatus.UNLOCKED})
+_STABLE_DOOR = frozenset({DoorStatus.OPENED, DoorStatus.CLOSED})
+
+
+class _ListenerChannel:
+    """
+    Latest-only delivery slot for one event listener.
+
+    Events for a lock that arrive while the listener is still busy replace the
+    undelivered one, so a stalled listener only ever sees the newest state
+    (lock_state events are idempotent).
+    """
+
+    __slots__ = ("listener", "pending", "ready", "task")
+
+    def __init__(self, listener: EventListener) -> None:
+        self.listener = listener
+        self.pending: Dict[str, dict] = {}
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
 
 
 class LockManager:
@@ -25,23 +50,39 @@ class LockManager:
       - event listeners (e.g. WebSocket server)
 
     Emits debounced, authoritative lock_state events.
-      {"type": "lock_state", "lock_name": "...", "state": {...}}
+      {"type": "lock_state", "lock_name": "...", "state": {...}, "state_json": "{...}"}
     """
 
     LOCK_DEBOUNCE_SECONDS = 2.0
     DOOR_DEBOUNCE_SECONDS = 0.5
     REFRESH_AFTER_SECONDS = 8.0
+    STALE_CHECK_SECONDS = 300.0
+    STALE_CHECK_JITTER_SECONDS = 30.0
+    STALE_AFTER_SECONDS = 3600.0
+    STALE_PROBE_TIMEOUT_SECONDS = 30.0
 
     def __init__(self) -> None:
         self._locks: Dict[str, BleLock] = {}
+        self._roster_version = 0  # bumped whenever the set of locks changes
         self._scanner: Optional[BleakScanner] = None
-        self._event_listeners: List[EventListener] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # bound in start()
+        self._listener_channels: List[_ListenerChannel] = []
+
+        # Bound PushLock.update_advertisement per lock, keyed by lowercased address
+        # and by BLE local name (fallback) so each advertisement hits at most one lock.
+        self._adv_by_address: Dict[str, AdvertisementSink] = {}
+        self._adv_by_name: Dict[str, AdvertisementSink] = {}
 
         # Track last commited stable lock + door independently
         self._critical_state: Dict[str, Tuple[Optional[LockStatus], Optional[DoorStatus]]] = {}
 
-        # Pending debounce task per lock
+        # Long-lived settle task per lock, woken by its "kick" event on new activity
         self._pending_tasks: Dict[str, asyncio.Task] = {}
+        self._kick: Dict[str, asyncio.Event] = {}
+
+        # Post-settle refresh timer per lock, and refreshes currently running
+        self._refresh_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
 
         # Last observed candidate state per lock
         self._pending_state: Dict[str, Tuple[Optional[LockStatus], Optional[DoorStatus]]] = {}
@@ -49,6 +90,12 @@ class LockManager:
         # Why we are debouncing (door vs lock)
         self._pending_reason: Dict[str, str] = {}
 
+        # Last observed connection activity per lock (time.monotonic()): a state
+        # callback or a successful refresh. Advertisements don't count, they only
+        # show the radio is alive. Checked by the stale watchdog.
+        self._last_activity: Dict[str, float] = {}
+        self._watchdog_task: Optional[asyncio.Task] = None
+
         # Global BLE op semaphore:
         # Ensures we never run overlapping BLE operations across multiple locks.
         self._ble_op_sem = asyncio.Semaphore(1)
@@ -59,9 +106,14 @@ class LockManager:
     def register_event_listener(self, listener: EventListener) -> None:
         """
         Listener signature: async def listener(event: dict) -> None
-        Events produced: {"type": "lock_state", "lock_name": ..., "state": {...}}
+        Events produced:
+          {"type": "lock_state", "lock_name": ..., "state": {...}, "state_json": "{...}"}
+        state is the lock snapshot; state_json is the same snapshot, already JSON-encoded.
         """
-        self._event_listeners.append(listener)
+        channel = _ListenerChannel(listener)
+        self._listener_channels.append(channel)
+        if self._loop is not None:
+            channel.task = self._loop.create_task(self._drain_listener(channel))
 
     # ------------------------------------------------------------------
     # Lock registration
@@ -74,6 +126,16 @@ class LockManager:
             raise ValueError(f"Duplicate lock_name: {lock.lock_name}")
 
         self._locks[lock.lock_name] = lock
+        self._roster_version += 1
+        sink = lock.push_lock.update_advertisement
+        self._adv_by_address[lock.address.lower()] = sink
+        self._adv_by_name[lock.local_name] = sink
+
+        # Bind hot-path state dicts as closure locals for _on_state
+        _pending_state = self._pending_state
+        _critical_state = self._critical_state
+        _pending_reason = self._pending_reason
+        _last_activity = self._last_activity
 
         # Connect BleLock's state events into our event bus.
         # NOTE: BleLock.register_state_listener is expected to call this as:
@@ -84,45 +146,44 @@ class LockManager:
             lock_info: LockInfo,
             conn_info: ConnectionInfo,
         ) -> None:
+            _last_activity[lock_name] = time.monotonic()
+
             lock_status = new_state.lock
             door_status = new_state.door
 
-            stable_lock = (
-                lock_status if lock_status in (LockStatus.LOCKED, LockStatus.UNLOCKED) else None
-            )
-            stable_door = (
-                door_status if door_status in (DoorStatus.OPENED, DoorStatus.CLOSED) else None
-            )
+            stable_lock = lock_status if lock_status in _STABLE_LOCK else None
+            stable_door = door_status if door_status in _STABLE_DOOR else None
 
             # compare against pending state first
-            prev_lock, prev_door = self._pending_state.get(
+            prev_lock, prev_door = _pending_state.get(
                 lock_name,
-                self._critical_state.get(lock_name, (None, None)),
+                _critical_state.get(lock_name, (None, None)),
             )
 
             lock_changed = stable_lock is not None and stable_lock != prev_lock
             door_changed = stable_door is not None and stable_door != prev_door
 
             if not lock_changed and not door_changed:
-                _LOGGER.debug(
-                    "[%s] Ignoring duplicate candidate state (lock=%s, door=%s)",
-                    lock_name,
-                    lock_status,
-                    door_status,
-                )
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug(
+                        "[%s] Ignoring duplicate candidate state (lock=%s, door=%s)",
+                        lock_name,
+                        lock_status,
+                        door_status,
+                    )
                 return
 
             # Update candidate state
-            self._pending_state[lock_name] = (
+            _pending_state[lock_name] = (
                 stable_lock if stable_lock is not None else prev_lock,
                 stable_door if stable_door is not None else prev_door,
             )
 
             # Door wins debounce priority
             if door_changed:
-                self._pending_reason[lock_name] = "door"
+                _pending_reason[lock_name] = "door"
             elif lock_changed:
-                self._pending_reason[lock_name] = "lock"
+                _pending_reason[lock_name] = "lock"
 
             self._schedule_state_settle(lock)
 
@@ -136,12 +197,15 @@ class LockManager:
         Run a BLE operation under the global semaphore.
         coro_factory must be a 0-arg callable returning an awaitable.
         """
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
         async with self._ble_op_sem:
-            _LOGGER.debug("[%s] BLE op start: %s", lock_name, op_name)
+            if debug:
+                _LOGGER.debug("[%s] BLE op start: %s", lock_name, op_name)
             try:
                 return await coro_factory()
             finally:
-                _LOGGER.debug("[%s] BLE op end: %s", lock_name, op_name)
+                if debug:
+                    _LOGGER.debug("[%s] BLE op end: %s", lock_name, op_name)
 
     async def cmd_lock(self, lock_name: str) -> None:
         lock = self.get_lock(lock_name)
@@ -154,75 +218,112 @@ class LockManager:
     async def cmd_refresh(self, lock_name: str) -> None:
         lock = self.get_lock(lock_name)
         await self._with_ble_lock(lock_name, "refresh", lock.refresh)
+        self._last_activity[lock_name] = time.monotonic()
 
     # ------------------------------------------------------------------
     # Unified debounce + refresh pipeline
     # ------------------------------------------------------------------
     def _schedule_state_settle(self, lock: BleLock) -> None:
+        """
+        Signal new activity for a lock. Starts its settle task on first use;
+        afterwards just kicks it (no task churn while the bolt is moving).
+        """
         lock_name = lock.lock_name
 
-        # Cancel any existing settle task
-        old_task: Optional[asyncio.Task] = self._pending_tasks.get(lock_name)
-        if old_task and not old_task.done():
-            old_task.cancel()
+        kick = self._kick.get(lock_name)
+        if kick is None:
+            kick = self._kick[lock_name] = asyncio.Event()
+            self._pending_tasks[lock_name] = self._loop.create_task(self._settle_loop(lock, kick))
 
-        settle_task: Optional[asyncio.Task] = None  # will be assigned after create_task
+        self._cancel_refresh(lock_name)
+        kick.set()
 
-        async def _settle():
-            nonlocal settle_task
-            try:
-                reason = self._pending_reason.get(lock_name)
-                delay = (
-                    self.DOOR_DEBOUNCE_SECONDS
-                    if reason == "door"
-                    else self.LOCK_DEBOUNCE_SECONDS
-                )
+    def _settle_delay(self, lock_name: str) -> float:
+        if self._pending_reason.get(lock_name) == "door":
+            return self.DOOR_DEBOUNCE_SECONDS
+        return self.LOCK_DEBOUNCE_SECONDS
 
-                # 1) Debounce
-                await asyncio.sleep(delay)
+    async def _settle_loop(self, lock: BleLock, kick: asyncio.Event) -> None:
+        lock_name = lock.lock_name
+        loop = self._loop
 
-                stable_lock, stable_door = self._pending_state.get(lock_name, (None, None))
-                self._critical_state[lock_name] = (stable_lock, stable_door)
+        while True:
+            await kick.wait()
+            kick.clear()
 
-                snapshot = lock.snapshot()
+            try:
+                # 1) Debounce: every kick pushes the deadline out again
+                deadline = loop.time() + self._settle_delay(lock_name)
+                while True:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(kick.wait(), timeout)
+                    except TimeoutError:
+                        break
+                    kick.clear()
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug("[%s] Settle deferred due to new activity", lock_name)
+                    deadline = loop.time() + self._settle_delay(lock_name)
 
-                if stable_lock is not None:
-                    snapshot["locked"] = stable_lock.name
-                if stable_door is not None:
-                    snapshot["door"] = stable_door.name
+                stable_lock, stable_door = self._pending_state.get(lock_name, (None, None))
+                self._critical_state[lock_name] = (stable_lock, stable_door)
+                self._pending_reason.pop(lock_name, None)
 
+                state, state_json = lock.snapshot_with_json(
+                    override_lock=stable_lock, override_door=stable_door
+                )
                 event = {
                     "type": "lock_state",
                     "lock_name": lock_name,
-                    "state": snapshot,
+                    "state": state,
+                    "state_json": state_json,
                 }
 
                 _LOGGER.info(
                     "[%s] State settled -> lock=%s, door=%s",
                     lock_name,
-                    snapshot.get("locked"),
-                    snapshot.get("door"),
+                    stable_lock.name if stable_lock is not None else None,
+                    stable_door.name if stable_door is not None else None,
                 )
 
-                await self._broadcast(event)
+                self._broadcast(event)
 
-                # 2) Reconcile with refresh (serialized across all locks)
-                await asyncio.sleep(self.REFRESH_AFTER_SECONDS)
-                _LOGGER.info("[%s] Refreshing lock after settle", lock_name)
-                await self.cmd_refresh(lock_name)
+                # 2) Reconcile with a refresh later on; new activity cancels it
+                self._schedule_refresh(lock_name)
 
             except asyncio.CancelledError:
-                _LOGGER.debug("[%s] Settle cancelled due to new activity", lock_name)
+                raise
             except Exception:
-                _LOGGER.exception("[%s] Error during settle/refresh", lock_name)
-            finally:
-                # IMPORTANT: only the currently-tracked task is allowed to clean up
-                if self._pending_tasks.get(lock_name) is settle_task:
-                    self._pending_tasks.pop(lock_name, None)
-                    self._pending_reason.pop(lock_name, None)
-
-        settle_task = asyncio.create_task(_settle())
-        self._pending_tasks[lock_name] = settle_task
+                _LOGGER.exception("[%s] Error during settle", lock_name)
+
+    def _schedule_refresh(self, lock_name: str) -> None:
+        self._cancel_refresh(lock_name, reason="rescheduled")
+        self._refresh_handles[lock_name] = self._loop.call_later(
+            self.REFRESH_AFTER_SECONDS, self._do_refresh, lock_name
+        )
+
+    def _cancel_refresh(self, lock_name: str, reason: str = "new activity") -> None:
+        handle = self._refresh_handles.pop(lock_name, None)
+        if handle is not None:
+            handle.cancel()
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug("[%s] Pending refresh cancelled (%s)", lock_name, reason)
+
+    def _do_refresh(self, lock_name: str) -> None:
+        self._refresh_handles.pop(lock_name, None)
+        task = self._loop.create_task(self._refresh_after_settle(lock_name))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh_after_settle(self, lock_name: str) -> None:
+        # Serialized across all locks via cmd_refresh
+        try:
+            _LOGGER.info("[%s] Refreshing lock after settle", lock_name)
+            await self.cmd_refresh(lock_name)
+        except Exception:
+            _LOGGER.exception("[%s] Error during refresh", lock_name)
 
     # ------------------------------------------------------------------
     # Accessors
@@ -233,6 +334,11 @@ class LockManager:
     def get_lock(self, lock_name: str) -> BleLock:
         return self._locks[lock_name]
 
+    @property
+    def roster_version(self) -> int:
+        """Changes whenever locks are added, so callers can cache derived views."""
+        return self._roster_version
+
     # ------------------------------------------------------------------
     # Lifecycle: start / stop
     # ------------------------------------------------------------------
@@ -243,6 +349,11 @@ class LockManager:
         if self._scanner:
             return
 
+        self._loop = asyncio.get_running_loop()
+
+        for channel in self._listener_channels:
+            channel.task = self._loop.create_task(self._drain_listener(channel))
+
         _LOGGER.info("Starting BleakScanner")
         self._scanner = BleakScanner(detection_callback=self._on_advertisement)
         await self._scanner.start()
@@ -251,6 +362,9 @@ class LockManager:
         # Start all locks
         for lock in self._locks.values():
             await lock.start()
+            self._last_activity.setdefault(lock.lock_name, time.monotonic())
+
+        self._watchdog_task = self._loop.create_task(self._stale_watchdog())
 
     async def stop(self) -> None:
         """
@@ -259,6 +373,11 @@ class LockManager:
         """
         _LOGGER.info("Stopping LockManager")
 
+        if self._watchdog_task:
+            self._watchdog_task.cancel()
+            await asyncio.gather(self._watchdog_task, return_exceptions=True)
+            self._watchdog_task = None
+
         # 1) Cancel + drain any pending settle tasks (prevents refresh-after-settle during shutdown)
         if self._pending_tasks:
             _LOGGER.info("Cancelling %d pending settle task(s)", len(self._pending_tasks))
@@ -272,10 +391,30 @@ class LockManager:
             await asyncio.gather(*tasks, return_exceptions=True)
 
             self._pending_tasks.clear()
+            self._kick.clear()
             self._pending_reason.clear()
             # Optional: clear candidate state too (depends on your preference)
             # self._pending_state.clear()
 
+        # Cancel scheduled / in-flight post-settle refreshes
+        for handle in self._refresh_handles.values():
+            handle.cancel()
+        self._refresh_handles.clear()
+        if self._refresh_tasks:
+            refresh_tasks = list(self._refresh_tasks)
+            for t in refresh_tasks:
+                t.cancel()
+            await asyncio.gather(*refresh_tasks, return_exceptions=True)
+
+        # Stop listener delivery tasks
+        drain_tasks = [c.task for c in self._listener_channels if c.task is not None]
+        for t in drain_tasks:
+            t.cancel()
+        await asyncio.gather(*drain_tasks, return_exceptions=True)
+        for channel in self._listener_channels:
+            channel.task = None
+            channel.pending.clear()
+
         # 2) Stop locks so they stop producing callbacks/work
         for lock in self._locks.values():
             await lock.stop()
@@ -286,6 +425,53 @@ class LockManager:
             await self._scanner.stop()
             self._scanner = None
 
+    # ------------------------------------------------------------------
+    # Stale connection watchdog
+    # ------------------------------------------------------------------
+    async def _stale_watchdog(self) -> None:
+        """
+        Periodically check connected locks that have shown no activity in
+        STALE_AFTER_SECONDS. Such a lock is probed with a bounded refresh; only
+        if that fails are its connections dropped, so a half-open connection
+        can't wedge refresh() while healthy idle connections are left alone.
+        """
+        while True:
+            await asyncio.sleep(
+                self.STALE_CHECK_SECONDS + random.uniform(0, self.STALE_CHECK_JITTER_SECONDS)
+            )
+
+            for lock_name, lock in self._locks.items():
+                if not lock.push_lock.is_connected:
+                    continue  # nothing that could be stale
+
+                now = time.monotonic()
+                idle = now - self._last_activity.get(lock_name, now)
+                if idle < self.STALE_AFTER_SECONDS:
+                    continue
+
+                _LOGGER.info("[%s] No activity for %.0fs while connected; probing", lock_name, idle)
+                try:
+                    await asyncio.wait_for(
+                        self.cmd_refresh(lock_name), self.STALE_PROBE_TIMEOUT_SECONDS
+                    )
+                    continue  # healthy; cmd_refresh recorded the activity
+                except Exception as ex:
+                    _LOGGER.warning(
+                        "[%s] Probe refresh failed (%r); closing stale connections",
+                        lock_name,
+                        ex,
+                    )
+
+                try:
+                    await self._with_ble_lock(
+                        lock_name, "close_stale_connections", lock.close_stale_connections
+                    )
+                except Exception:
+                    _LOGGER.exception("[%s] Error closing stale connections", lock_name)
+
+                # Don't retry until another full window passes without activity
+                self._last_activity[lock_name] = time.monotonic()
+
     # ------------------------------------------------------------------
     # BLE advertisement fan-out
     # ------------------------------------------------------------------
@@ -296,23 +482,41 @@ class LockManager:
     ) -> None:
         """
         Called by BleakScanner when any BLE advertisement is seen.
-        We feed them to all locks; yalexs_ble internally filters by name/address.
+        Only the lock matching the advertisement's address (or local name) is fed.
         """
-        for lock in self._locks.values():
-            lock.push_lock.update_advertisement(device, adv)
+        sink = self._adv_by_address.get(device.address.lower())
+        if sink is None:
+            local_name = adv.local_name
+            if not local_name:
+                return
+            sink = self._adv_by_name.get(local_name)
+            if sink is None:
+                return
+        sink(device, adv)
 
     # ------------------------------------------------------------------
     # Event broadcast
     # ------------------------------------------------------------------
-    async def _broadcast(self, event: dict) -> None:
+    def _broadcast(self, event: dict) -> None:
         """
         Fan out an event to all registered listeners.
+        Only the newest undelivered event per lock is kept for each listener.
         """
-        if not self._event_listeners:
-            return
-
-        for listener in self._event_listeners:
-            asyncio.create_task(self._run_listener(listener, event))
+        lock_name = event["lock_name"]
+        for channel in self._listener_channels:
+            channel.pending[lock_name] = event
+            channel.ready.set()
+
+    async def _drain_listener(self, channel: _ListenerChannel) -> None:
+        pending = channel.pending
+        while True:
+            await channel.ready.wait()
+            channel.ready.clear()
+            while pending:
+                # Deliver in arrival order (oldest lock first)
+                lock_name = next(iter(pending))
+                event = pending.pop(lock_name)
+                await self._run_listener(channel.listener, event)
 
     async def _run_listener(self, listener: EventListener, event: dict) -> None:
         try:
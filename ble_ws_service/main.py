@@ -4,6 +4,11 @@ import asyncio
 import logging
 import signal
 
+try:
+    import uvloop
+except ImportError:  # e.g. Windows
+    uvloop = None
+
 from version import __version__
 from config import load_config
 from ble_lock import BleLock
@@ -15,6 +20,10 @@ logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
+# The format doesn't use thread/process info; skip collecting it per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 _LOGGER = logging.getLogger("august_ble_ws_service")
 
 
@@ -71,4 +80,7 @@ async def main() -> None:
 
 if __name__ == "__main__":
     _LOGGER.info("Starting BLE WS Service version %s", __version__)
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hmac
 import logging
 import time
-from typing import Dict, Set, Optional
+from urllib.parse import parse_qs, urlsplit
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import msgspec
 
 from http import HTTPStatus
-from websockets.asyncio.server import serve, ServerConnection, Server
+from websockets.asyncio.server import broadcast, serve, ServerConnection, Server
 from websockets.server import Request
 from websockets.exceptions import ConnectionClosed
 
@@ -15,6 +18,48 @@ from lock_manager import LockManager
 
 _LOGGER = logging.getLogger(__name__)
 
+MAX_MESSAGE_SIZE = 2 ** 16  # bytes
+
+_dumps = msgspec.json.encode
+
+# Pre-encoded responses for common errors without a request_id
+_INVALID_JSON_RESPONSE = _dumps(
+    {"type": "response", "request_id": None, "status": "error", "error": "invalid_json"}
+)
+_TYPE_MUST_BE_COMMAND_RESPONSE = _dumps(
+    {"type": "response", "request_id": None, "status": "error", "error": "type_must_be_command"}
+)
+
+_RESPONSE_PREFIX = b'{"type":"response","request_id":'
+
+
+class Command(msgspec.Struct):
+    """
+    Client command message; decoded straight from the raw frame.
+    Fields are deliberately untyped so a bad field never hides request_id;
+    handlers validate the values they use.
+    """
+
+    type: Any = None
+    request_id: Any = None  # echoed back as-is
+    command: Any = None
+    lock_name: Any = None
+
+
+_decode_command = msgspec.json.Decoder(Command).decode
+_decode_command_msgpack = msgspec.msgpack.Decoder(Command).decode
+_encode_msgpack = msgspec.msgpack.encode
+
+# Handshake query parameter selecting the wire format, e.g. ws://host:8765/?protocol_version=2
+PROTOCOL_VERSION_PARAM = "protocol_version"
+PROTOCOL_MSGPACK = "2"
+
+CommandHandler = Callable[[ServerConnection, Command], Awaitable[None]]
+
+# Lock events are assembled around the pre-encoded snapshot from LockManager.
+# Kept as str so broadcast() sends text frames.
+_EVENT_PREFIX = '{"type":"event","event":"lock_state","lock_name":'
+
 
 class WebSocketServer:
     """
@@ -35,6 +80,13 @@ class WebSocketServer:
 
     Protocol (JSON messages):
 
+    Server messages are UTF-8 JSON in text frames. Client commands may be sent
+    as text or binary frames containing UTF-8 JSON.
+
+    Clients connecting with ?protocol_version=2 use MessagePack instead:
+    the same message shapes, encoded as MessagePack in binary frames,
+    in both directions.
+
     From client (command):
       {
         "type": "command",
@@ -67,13 +119,37 @@ class WebSocketServer:
         self._host = host
         self._port = port
         self._auth_token = auth_token
-
-        # Track connected clients
-        self._clients: Set[ServerConnection] = set()
+        # Full expected header, compared in constant time per handshake
+        self._expected_auth_header: Optional[bytes] = (
+            f"Bearer {auth_token}".encode() if auth_token else None
+        )
+
+        # Track connected clients, per wire format (JSON / MessagePack).
+        # Plain lists: broadcast() iterates them directly, and connects /
+        # disconnects are rare compared to events.
+        self._clients: List[ServerConnection] = []
+        self._msgpack_clients: List[ServerConnection] = []
+        # Wire format per connection (True = MessagePack), decided once at connect
+        self._uses_msgpack: Dict[ServerConnection, bool] = {}
+
+        # Encoded event prefix per lock_name (everything up to the state object)
+        self._event_prefixes: Dict[str, str] = {}
 
         # Server handle from websockets.asyncio.server.serve
         self._server: Optional[Server] = None
 
+        # list_locks response body cached per LockManager roster version
+        self._list_locks_cache: Optional[Tuple[int, bytes]] = None
+
+        # Command name -> handler(websocket, cmd)
+        self._handlers: Dict[str, CommandHandler] = {
+            "heartbeat": self._cmd_heartbeat,
+            "list_locks": self._cmd_list_locks,
+            "lock": self._cmd_lock,
+            "unlock": self._cmd_unlock,
+            "get_state": self._cmd_get_state,
+        }
+
         # Subscribe to lock events from LockManager
         self._lock_manager.register_event_listener(self._handle_lock_event)
 
@@ -82,7 +158,7 @@ class WebSocketServer:
             _connection: ServerConnection,
             request: Request,
     ):
-        if not self._auth_token:
+        if self._expected_auth_header is None:
             return None  # auth disabled
 
         auth_header = request.headers.get("Authorization")
@@ -95,8 +171,7 @@ class WebSocketServer:
                 b"Missing Authorization header\n",
             )
 
-        token = auth_header.removeprefix("Bearer ").strip()
-        if token != self._auth_token:
+        if not hmac.compare_digest(auth_header.encode(), self._expected_auth_header):
             _LOGGER.warning("Invalid auth token")
 
             return (
@@ -113,9 +188,16 @@ class WebSocketServer:
 
         Caller is responsible for keeping the event loop running
         (e.g. by awaiting a forever Future elsewhere).
+
+        The server only speaks plain ws://. TLS is deliberately not terminated
+        in-process; if wss:// is needed, run a reverse proxy in front of the
+        service (see examples/nginx.conf).
         """
+        # compression=None: messages are small LAN-local JSON, permessage-deflate
+        # would cost more CPU per frame than it saves in bandwidth.
+        # max_size: commands are tiny; bound per-frame memory accordingly.
         self._server = await serve(self._handler, self._host, self._port, process_request=self._process_request,
-                                   ping_interval=30, ping_timeout=10)
+                                   ping_interval=30, ping_timeout=10, compression=None, max_size=MAX_MESSAGE_SIZE)
         _LOGGER.info("WebSocket server listening on ws://%s:%d", self._host, self._port)
 
     async def stop(self) -> None:
@@ -131,10 +213,11 @@ class WebSocketServer:
             self._server = None
 
         # Close all existing clients.
-        if self._clients:
-            # Copy to list to avoid modification during iteration.
-            clients = list(self._clients)
-            self._clients.clear()
+        if self._clients or self._msgpack_clients:
+            # Swap out the lists so closing clients can't mutate them mid-iteration.
+            clients = self._clients + self._msgpack_clients
+            self._clients = []
+            self._msgpack_clients = []
 
             close_coros = [
                 self._safe_close(ws, code=1001, reason="Server shutting down")
@@ -152,38 +235,58 @@ class WebSocketServer:
         Path is available as websocket.request.path if needed.
         """
         remote = getattr(websocket, "remote_address", None)
-        _LOGGER.info("Client connected from %s", remote)
-        self._clients.add(websocket)
+        use_msgpack = self._wants_msgpack(websocket)
+        _LOGGER.info("Client connected from %s (%s)", remote, "msgpack" if use_msgpack else "json")
+        self._uses_msgpack[websocket] = use_msgpack
+        if use_msgpack:
+            self._msgpack_clients.append(websocket)
+            decode = _decode_command_msgpack
+        else:
+            self._clients.append(websocket)
+            decode = _decode_command
 
         try:
             async for raw in websocket:
-                # raw is a text message (str) by default.
+                # raw is str for text frames, bytes for binary frames.
+                # JSON accepts both; MessagePack must arrive in binary frames.
+                if use_msgpack and isinstance(raw, str):
+                    await self._send_error(websocket, request_id=None, error="invalid_msgpack")
+                    continue
+
                 try:
-                    msg = json.loads(raw)
-                except json.JSONDecodeError:
+                    cmd = decode(raw)
+                except msgspec.ValidationError as exc:
                     await self._send_error(
                         websocket,
                         request_id=None,
-                        error="invalid_json",
+                        error=f"invalid_message: {exc}",
                     )
                     continue
+                except msgspec.DecodeError:
+                    if use_msgpack:
+                        await self._send_error(websocket, request_id=None, error="invalid_msgpack")
+                    else:
+                        await self._safe_send(websocket, _INVALID_JSON_RESPONSE)
+                    continue
 
-                await self._handle_message(websocket, msg)
+                await self._handle_message(websocket, cmd)
 
         except ConnectionClosed:
             _LOGGER.info("Client disconnected: %s", remote)
         except Exception:
             _LOGGER.exception("Unexpected error in WebSocket handler")
         finally:
-            self._clients.discard(websocket)
+            self._remove_client(websocket)
 
     async def _handle_message(
-        self, websocket: ServerConnection, msg: Dict
+        self, websocket: ServerConnection, cmd: Command
     ) -> None:
-        msg_type = msg.get("type")
-        request_id = msg.get("request_id")
+        request_id = cmd.request_id
 
-        if msg_type != "command":
+        if cmd.type != "command":
+            if request_id is None and not self._uses_msgpack.get(websocket, False):
+                await self._safe_send(websocket, _TYPE_MUST_BE_COMMAND_RESPONSE)
+                return
             await self._send_error(
                 websocket,
                 request_id=request_id,
@@ -191,89 +294,151 @@ class WebSocketServer:
             )
             return
 
-        command = msg.get("command")
-        lock_name = msg.get("lock_name")
-
         try:
-            if command == "heartbeat":
-                await self._send_ok(
-                    websocket,
-                    request_id=request_id,
-                    data={"server_time": time.time()},
-                )
-                return
-
-            if command == "list_locks":
-                lock_names = self._lock_manager.get_lock_names()
-                await self._send_ok(
-                    websocket,
-                    request_id=request_id,
-                    data={"locks": lock_names},
-                )
-                return
-
-            if command in ("lock", "unlock", "get_state") and not lock_name:
-                raise ValueError("lock_name is required")
-
-            if command == "lock":
-                await self._lock_manager.cmd_lock(lock_name)
-                await self._send_ok(
-                    websocket,
-                    request_id=request_id,
-                    data={"lock_name": lock_name},
-                )
-                return
-
-            if command == "unlock":
-                await self._lock_manager.cmd_unlock(lock_name)
-                await self._send_ok(
-                    websocket,
-                    request_id=request_id,
-                    data={"lock_name": lock_name},
-                )
-                return
-
-            if command == "get_state":
-                snapshot = self._lock_manager.get_lock(lock_name).snapshot()
-                await self._send_ok(
-                    websocket,
-                    request_id=request_id,
-                    data=snapshot,
-                )
-                return
-
-            # Unknown command
-            raise ValueError(f"unknown_command: {command}")
+            command = cmd.command
+            handler = self._handlers.get(command) if isinstance(command, str) else None
+            if handler is None:
+                raise ValueError(f"unknown_command: {cmd.command}")
+            await handler(websocket, cmd)
         except Exception as exc:
-            _LOGGER.exception("Error handling command: %s", msg)
+            _LOGGER.exception("Error handling command: %s", cmd)
             await self._send_error(
                 websocket,
                 request_id=request_id,
                 error=str(exc),
             )
 
+    # ==== Command handlers ================================================
+    # Each handler sends its own success response; errors propagate to
+    # _handle_message, which replies with an error response.
+
+    @staticmethod
+    def _require_lock_name(cmd: Command) -> str:
+        lock_name = cmd.lock_name
+        if not lock_name:
+            raise ValueError("lock_name is required")
+        if not isinstance(lock_name, str):
+            raise ValueError("lock_name must be a string")
+        return lock_name
+
+    async def _cmd_heartbeat(
+        self, websocket: ServerConnection, cmd: Command
+    ) -> None:
+        await self._send_ok(
+            websocket,
+            request_id=cmd.request_id,
+            data={"server_time": time.time()},
+        )
+
+    async def _cmd_list_locks(
+        self, websocket: ServerConnection, cmd: Command
+    ) -> None:
+        if self._uses_msgpack.get(websocket, False):
+            await self._send_ok(
+                websocket,
+                request_id=cmd.request_id,
+                data={"locks": self._lock_manager.get_lock_names()},
+            )
+            return
+
+        version = self._lock_manager.roster_version
+        cache = self._list_locks_cache
+        if cache is None or cache[0] != version:
+            suffix = (
+                b',"status":"ok","data":{"locks":'
+                + _dumps(self._lock_manager.get_lock_names())
+                + b"}}"
+            )
+            cache = self._list_locks_cache = (version, suffix)
+
+        await self._safe_send(
+            websocket,
+            _RESPONSE_PREFIX + _dumps(cmd.request_id) + cache[1],
+        )
+
+    async def _cmd_lock(
+        self, websocket: ServerConnection, cmd: Command
+    ) -> None:
+        lock_name = self._require_lock_name(cmd)
+        await self._lock_manager.cmd_lock(lock_name)
+        await self._send_ok(
+            websocket,
+            request_id=cmd.request_id,
+            data={"lock_name": lock_name},
+        )
+
+    async def _cmd_unlock(
+        self, websocket: ServerConnection, cmd: Command
+    ) -> None:
+        lock_name = self._require_lock_name(cmd)
+        await self._lock_manager.cmd_unlock(lock_name)
+        await self._send_ok(
+            websocket,
+            request_id=cmd.request_id,
+            data={"lock_name": lock_name},
+        )
+
+    async def _cmd_get_state(
+        self, websocket: ServerConnection, cmd: Command
+    ) -> None:
+        lock_name = self._require_lock_name(cmd)
+        snapshot = self._lock_manager.get_lock(lock_name).snapshot()
+        await self._send_ok(
+            websocket,
+            request_id=cmd.request_id,
+            data=snapshot,
+        )
+
     async def _handle_lock_event(self, event: dict) -> None:
         """
         Called by LockManager when a lock state changes. Broadcast to all clients.
 
-        Event shape: {"type": "lock_state", "lock_name": ..., "state": {...}}
+        Event shape: {"type": "lock_state", "lock_name": ..., "state": {...}, "state_json": "{...}"}
         """
+        if self._msgpack_clients:
+            broadcast(
+                self._msgpack_clients,
+                _encode_msgpack(
+                    {
+                        "type": "event",
+                        "event": "lock_state",
+                        "lock_name": event["lock_name"],
+                        "state": event["state"],
+                    }
+                ),
+            )
+
         if not self._clients:
             return
 
-        payload = {
-            "type": "event",
-            "event": "lock_state",
-            "lock_name": event["lock_name"],
-            "state": event["state"],
-        }
-        msg = json.dumps(payload)
+        lock_name = event["lock_name"]
+        prefix = self._event_prefixes.get(lock_name)
+        if prefix is None:
+            prefix = _EVENT_PREFIX + _dumps(lock_name).decode() + ',"state":'
+            self._event_prefixes[lock_name] = prefix
 
-        coros = [self._safe_send(ws, msg) for ws in list(self._clients)]
-        await asyncio.gather(*coros, return_exceptions=True)
+        msg = prefix + event["state_json"] + "}"
+
+        # Encodes the frame once and writes it to every open connection;
+        # closed or failing connections are skipped (and logged) by websockets.
+        broadcast(self._clients, msg)
 
     # ==== Helper methods ==================================================
 
+    @staticmethod
+    def _wants_msgpack(websocket: ServerConnection) -> bool:
+        request = getattr(websocket, "request", None)
+        if request is None:
+            return False
+        query = parse_qs(urlsplit(request.path).query)
+        return query.get(PROTOCOL_VERSION_PARAM, [None])[-1] == PROTOCOL_MSGPACK
+
+    async def _send_response(self, websocket: ServerConnection, response: Dict) -> None:
+        if self._uses_msgpack.get(websocket, False):
+            await self._safe_send(websocket, _encode_msgpack(response), text=False)
+        else:
+            await self._safe_send(websocket, _dumps(response))
+
     async def _send_ok(
         self,
         websocket: ServerConnection,
@@ -286,7 +451,7 @@ class WebSocketServer:
             "status": "ok",
             "data": data,
         }
-        await self._safe_send(websocket, json.dumps(response))
+        await self._send_response(websocket, response)
 
     async def _send_error(
         self,
@@ -300,19 +465,31 @@ class WebSocketServer:
             "status": "error",
             "error": error,
         }
-        await self._safe_send(websocket, json.dumps(response))
+        await self._send_response(websocket, response)
 
-    async def _safe_send(self, ws: ServerConnection, msg: str) -> None:
+    async def _safe_send(self, ws: ServerConnection, msg: bytes, text: bool = True) -> None:
         """
         Send a message to a client, ignoring broken connections.
+        JSON goes out as a text frame (the Hubitat driver only handles text
+        messages); MessagePack as a binary frame (text=False).
         """
         try:
-            await ws.send(msg)
+            await ws.send(msg, text=text)
         except ConnectionClosed:
-            self._clients.discard(ws)
+            self._remove_client(ws)
         except Exception:
             _LOGGER.exception("Error sending message to client")
-            self._clients.discard(ws)
+            self._remove_client(ws)
+
+    def _remove_client(self, ws: ServerConnection) -> None:
+        use_msgpack = self._uses_msgpack.pop(ws, None)
+        if use_msgpack is None:
+            return  # already removed
+        clients = self._msgpack_clients if use_msgpack else self._clients
+        try:
+            clients.remove(ws)
+        except ValueError:
+            pass  # lists already swapped out by stop()
 
     async def _safe_close(
         self,
@@ -328,4 +505,4 @@ class WebSocketServer:
         except Exception:
             _LOGGER.debug("Error closing client connection", exc_info=True)
         finally:
-            self._clients.discard(ws)
+            self._remove_client(ws)
@@ -3,20 +3,44 @@
 Interactive CLI client for August BLE WebSocket API. This intended for testing the ble_service
 
 Example Usage: python ble_service_client_cli.py ws://10.0.3.13:8765 --token ws-shared-secret
+Add --msgpack to use the MessagePack wire format (protocol_version=2; requires msgspec).
 """
 
 import argparse
 import asyncio
-import json
 import logging
 import shlex
-import uuid
+import threading
+from urllib.parse import urlsplit, urlunsplit
 from typing import Callable, Dict, Optional, Any
 
 from pprint import pprint
 from websockets.asyncio.client import connect
 from websockets.exceptions import ConnectionClosed
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import uvloop
+except ImportError:  # e.g. Windows
+    uvloop = None
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -34,6 +58,7 @@ class AugustBLEWebSocketClient:
       - Receiving async lock_state events
       - Auto reconnect
       - Waits until initial connection is ready
+      - JSON (default) or MessagePack (protocol_version=2) wire format
     """
 
     def __init__(
@@ -42,17 +67,35 @@ class AugustBLEWebSocketClient:
         event_callback: Optional[Callable[[dict], Any]] = None,
         reconnect_delay: float = 5.0,
         headers: Optional[Dict[str, str]] = None,
+        msgpack: bool = False,
     ):
+        if msgpack:
+            if msgspec is None:
+                raise RuntimeError("msgpack wire format requires the msgspec package")
+            parts = urlsplit(url)
+            query = f"{parts.query}&protocol_version=2" if parts.query else "protocol_version=2"
+            url = urlunsplit(parts._replace(path=parts.path or "/", query=query))
+            self._encode = msgspec.msgpack.encode
+            self._decode = msgspec.msgpack.decode
+        else:
+            self._encode = _dumps
+            self._decode = _loads
+
         self.url = url
         self.event_callback = event_callback
         self.reconnect_delay = reconnect_delay
         self.headers = headers or {}
 
         self._pending: Dict[str, asyncio.Future] = {}
+        self._next_id = 0  # request_id only needs to be unique per client
         self._ws = None
         self._listener_task = None
         self._running = False
 
+        # Events are handed to a single consumer task instead of a task per event
+        self._event_queue: asyncio.Queue = asyncio.Queue(maxsize=1024)
+        self._event_consumer = None
+
         # Fire when first connection is established
         self._connected_event = asyncio.Event()
 
@@ -66,6 +109,8 @@ class AugustBLEWebSocketClient:
             return
 
         self._running = True
+        if self.event_callback:
+            self._event_consumer = asyncio.create_task(self._consume_events())
         self._listener_task = asyncio.create_task(self._run_forever())
 
         # Wait until we are connected at least once
@@ -84,6 +129,14 @@ class AugustBLEWebSocketClient:
         if self._listener_task:
             await self._listener_task
 
+        if self._event_consumer:
+            self._event_consumer.cancel()
+            try:
+                await self._event_consumer
+            except asyncio.CancelledError:
+                pass
+            self._event_consumer = None
+
         for fut in self._pending.values():
             if not fut.done():
                 fut.cancel()
@@ -109,7 +162,13 @@ class AugustBLEWebSocketClient:
         while self._running:
             try:
                 _LOGGER.info("Connecting to %s", self.url)
-                async with connect(self.url, additional_headers=self.headers) as ws:
+                # The service disables permessage-deflate; don't offer it
+                async with connect(
+                    self.url,
+                    additional_headers=self.headers,
+                    compression=None,
+                    max_size=2 ** 16,
+                ) as ws:
                     self._ws = ws
                     _LOGGER.info("Connected")
 
@@ -137,7 +196,7 @@ class AugustBLEWebSocketClient:
     async def _listen(self):
         try:
             async for raw in self._ws:
-                msg = json.loads(raw)
+                msg = self._decode(raw)
                 msg_type = msg.get("type")
 
                 if msg_type == "response":
@@ -152,7 +211,10 @@ class AugustBLEWebSocketClient:
 
                 if msg_type == "event":
                     if self.event_callback:
-                        asyncio.create_task(self.event_callback(msg))
+                        try:
+                            self._event_queue.put_nowait(msg)
+                        except asyncio.QueueFull:
+                            _LOGGER.warning("Event queue full; dropping event: %s", msg)
                     continue
 
                 _LOGGER.warning("Unknown message type received: %s", msg)
@@ -162,15 +224,25 @@ class AugustBLEWebSocketClient:
         except Exception:
             _LOGGER.exception("Listener failure")
 
+    async def _consume_events(self):
+        while True:
+            msg = await self._event_queue.get()
+            try:
+                await self.event_callback(msg)
+            except Exception:
+                _LOGGER.exception("Event callback failure")
+
     # ------------------------------------------------------------------
     # Command Sending
     # ------------------------------------------------------------------
 
     async def _send_command(self, command: str, lock_name: Optional[str] = None):
-        await self._connected_event.wait()  # NEW: ensure connection
+        if not self._connected_event.is_set():
+            await self._connected_event.wait()  # ensure connection
 
-        request_id = uuid.uuid4().hex
-        future = asyncio.get_event_loop().create_future()
+        self._next_id += 1
+        request_id = str(self._next_id)
+        future = asyncio.get_running_loop().create_future()
         self._pending[request_id] = future
 
         payload = {
@@ -181,7 +253,8 @@ class AugustBLEWebSocketClient:
         if lock_name:
             payload["lock_name"] = lock_name
 
-        await self._ws.send(json.dumps(payload))
+        # Binary frame: the server skips UTF-8 validation on receive
+        await self._ws.send(self._encode(payload))
 
         return await future  # Wait for server response
 
@@ -212,7 +285,7 @@ Other:
 
 
 class InteractiveShell:
-    def __init__(self, url: str, auth_token: Optional[str] = None):
+    def __init__(self, url: str, auth_token: Optional[str] = None, msgpack: bool = False):
         self.url = url
 
         headers = {}
@@ -223,15 +296,47 @@ class InteractiveShell:
             url=url,
             event_callback=self._on_event,
             headers=headers,
+            msgpack=msgpack,
         )
         self._running = True
 
+        # One long-lived stdin reader thread feeds lines into this queue;
+        # None signals EOF. (Ctrl+C is delivered to the main thread and handled
+        # in _repl.) The thread only prompts once the REPL asks for the next
+        # line, so output and prompt don't interleave.
+        self._lines: Optional[asyncio.Queue] = None
+        self._want_line = threading.Event()
+
     async def start(self):
         print(BANNER)
         await self.client.start()  # now guaranteed to connect
 
+        self._lines = asyncio.Queue()
+        threading.Thread(
+            target=self._read_input,
+            args=(asyncio.get_running_loop(),),
+            name="stdin-reader",
+            daemon=True,
+        ).start()
+
         await self._repl()
 
+    def _read_input(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Blocking stdin reader, runs in its own thread."""
+        while True:
+            self._want_line.wait()
+            self._want_line.clear()
+            try:
+                line = input("> ")
+            except EOFError:
+                line = None
+            try:
+                loop.call_soon_threadsafe(self._lines.put_nowait, line)
+            except RuntimeError:
+                return  # event loop already closed
+            if line is None:
+                return
+
     async def _on_event(self, event: dict):
         print("\n🔔 EVENT RECEIVED:")
         pprint(event)
@@ -239,12 +344,17 @@ class InteractiveShell:
 
     async def _repl(self):
         while self._running:
+            self._want_line.set()
             try:
-                line = await asyncio.to_thread(input, "> ")
-                line = line.strip()
-            except (EOFError, KeyboardInterrupt):
+                line = await self._lines.get()
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                # Ctrl+C: asyncio.run cancels the main task
+                line = None
+            if line is None:
                 print("\nExiting...")
+                await self.client.stop()
                 break
+            line = line.strip()
 
             if not line:
                 continue
@@ -321,6 +431,12 @@ def parse_args() -> argparse.Namespace:
         default=None,
     )
 
+    parser.add_argument(
+        "--msgpack",
+        action="store_true",
+        help="Use the MessagePack wire format (protocol_version=2)",
+    )
+
     return parser.parse_args()
 
 
@@ -330,9 +446,13 @@ async def main():
     shell = InteractiveShell(
         url=args.url,
         auth_token=args.auth_token,
+        msgpack=args.msgpack,
     )
     await shell.start()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())